@@ -2,13 +2,13 @@ import os
 import sys
 import pygame
 import hid
-import threading
-import queue
+import collections
 import random
 import logging
 
 # Configure logging to log to both a file and the console
-logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(message)s')
+LOG_LEVEL = logging.INFO  # Switch to logging.DEBUG to trace food/enemy events
+logging.basicConfig(level=LOG_LEVEL, format='%(asctime)s - %(message)s')
 file_handler = logging.FileHandler('game_log.log')
 file_handler.setLevel(logging.DEBUG)
 file_handler.setFormatter(logging.Formatter('%(asctime)s - %(message)s'))
@@ -19,9 +19,13 @@ console_handler.setLevel(logging.DEBUG)
 console_handler.setFormatter(logging.Formatter('%(asctime)s - %(message)s'))
 logging.getLogger().addHandler(console_handler)
 
+logger = logging.getLogger(__name__)
+_DBG = logger.isEnabledFor(logging.DEBUG)  # Checked once so hot paths skip disabled debug calls entirely
+
 # Constants for the display
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
+SCREEN_RECT = pygame.Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)  # Shared bounds for clamping, never mutate
 FPS = 60
 
 # Set up the colors
@@ -39,6 +43,12 @@ clock = pygame.time.Clock()
 global game_over
 game_over = False
 MAX_FOOD_ITEMS = 10  # Maximum number of food items allowed at any time
+DIRECTIONS = ((1, 0), (-1, 0), (0, 1), (0, -1))  # Indexed with random.getrandbits(2)
+JITTER_STEPS = (-1, 1)  # Indexed with random.getrandbits(1)
+PLACEMENT_ATTEMPTS = 32  # Random tries before falling back to scanning for empty grid cells
+PLAYER_SURFACE_SIZE = 200  # Side of the player's backing surface, never grown; above the zoom threshold of 120 px
+current_zoom = 1.0  # Scale applied to every sprite's base image
+scaled_image_cache = {}  # (color, base_size, zoom) -> scaled Surface shared between sprites
 
 def normalize_joystick_value(value):
     # Normalization to -1 to 1 range
@@ -58,12 +68,6 @@ def find_device(vid, pid):
             return device_info
     return None
 
-def device_read_thread(device, data_queue, stop_event):
-    while not stop_event.is_set():
-        data = device.read(33)  # Adjust the number of bytes per XK-12 specification
-        if data:
-            data_queue.put(data)
-
 def open_device():
     # Vendor ID and Product ID for X-keys device
     device_info = find_device(0x05f3, 0x0429)
@@ -75,70 +79,149 @@ def open_device():
     device_path = device_info['path']
     try:
         device.open_path(device_path)
+        # read() then returns [] right away when no report is waiting
+        device.set_nonblocking(1)
         print("Device opened successfully.")
         return device
     except Exception as e:
         print(f"Failed to open device: {e}")
         sys.exit()
 
-def parse_joystick(data, button_states):
-    # Interpret bytes for button states
-    button_map = {
-        0: [1, 5, 9],   # Byte 2: Column 1
-        1: [2, 6, 10],  # Byte 3: Column 2
-        2: [3, 7, 11],  # Byte 4: Column 3
-        3: [4, 8, 12]   # Byte 5: Column 4
-    }
-
+# Normalized axis value for every possible raw byte, so parsing is a table lookup
+AXIS_LUT = tuple(normalize_joystick_value(value) for value in range(256))
+# (byte offset, bit mask) for buttons 1..12; button i + 1 is column i % 4 (bytes 2-5), row i // 4
+BUTTON_LUT = tuple((2 + i % 4, 1 << (i // 4)) for i in range(12))
+
+def parse_joystick(data, button_states, button_mask):
+    # button_mask holds the packed bits of the previous report, the new mask is returned
+    # Pack the 12 button bits, bit i is button i + 1
+    mask = 0
+    for i, (offset, bit_mask) in enumerate(BUTTON_LUT):
+        if data[offset] & bit_mask:
+            mask |= 1 << i
+
+    # Only buttons whose bit flipped since the last report need their state updated
+    changed = mask ^ button_mask
     pressed_buttons = []
+    while changed:
+        bit = changed & -changed
+        button_index = bit.bit_length() - 1
+        if mask & bit:
+            button_states[button_index] = "Pressed"
+            pressed_buttons.append(button_index + 1)
+        else:
+            button_states[button_index] = "Released"
+        changed ^= bit
 
-    for column in range(4):  # Four bytes for columns (D1 to D4)
-        byte_value = data[2 + column]
-        for bit in range(3):  # Each byte has 3 relevant bits
-            button_index = button_map[column][bit] - 1
-            mask = 1 << bit
-            if byte_value & mask:
-                if button_states[button_index] != "Pressed":
-                    button_states[button_index] = "Pressed"
-                    pressed_buttons.append(button_map[column][bit])
-            else:
-                if button_states[button_index] == "Pressed":
-                    button_states[button_index] = "Released"
-    
     if pressed_buttons:
         print(" and ".join(map(str, pressed_buttons)) + " pressed")
 
-    # Extract raw X, Y, and Z data
-    raw_x = data[6]
-    raw_y = data[7]
-    raw_z = data[8]
-
-    # Normalize X, Y, and Z
-    x_normalized = normalize_joystick_value(raw_x)
-    y_normalized = -normalize_y_axis(raw_y)  # Invert Y-axis for correct screen coordinates
-    z_normalized = -normalize_joystick_value(raw_z)
-    return x_normalized, y_normalized, z_normalized
-
-class Player(pygame.sprite.Sprite):
+    # Normalize raw X, Y, and Z data
+    x_normalized = AXIS_LUT[data[6]]
+    y_normalized = -AXIS_LUT[data[7]]  # Invert Y-axis for correct screen coordinates
+    z_normalized = -AXIS_LUT[data[8]]
+    return x_normalized, y_normalized, z_normalized, mask
+
+def scaled_image(sprite, zoom):
+    # Scale from the unscaled base image so repeated zooms never degrade it
+    if zoom == 1.0:
+        return sprite.base_image
+    key = (sprite.color, sprite.base_size, zoom)
+    image = scaled_image_cache.get(key)
+    if image is None:
+        size = max(1, int(sprite.base_size * zoom))
+        image = pygame.transform.smoothscale(sprite.base_image, (size, size))
+        scaled_image_cache[key] = image
+    return image
+
+def apply_zoom(sprite):
+    sprite.image = scaled_image(sprite, current_zoom)
+    sprite.rect = sprite.image.get_rect(center=sprite.rect.center)
+
+class SpatialHash:
+    """ Uniform grid that buckets sprites by every cell their rect overlaps. """
+    def __init__(self, cell=128):
+        self.cell = cell
+        self.d = collections.defaultdict(set)  # (cx, cy) -> sprites touching that cell
+        self.sprite_cells = {}  # sprite -> cells it was last bucketed into
+
+    def cells_for(self, rect):
+        cell = self.cell
+        cx_start, cx_end = rect.left // cell, rect.right // cell
+        cy_start, cy_end = rect.top // cell, rect.bottom // cell
+        return tuple((cx, cy) for cx in range(cx_start, cx_end + 1) for cy in range(cy_start, cy_end + 1))
+
+    def insert(self, sprite, cells=None):
+        if cells is None:
+            cells = self.cells_for(sprite.rect)
+        self.sprite_cells[sprite] = cells
+        for key in cells:
+            self.d[key].add(sprite)
+
+    def remove(self, sprite):
+        for key in self.sprite_cells.pop(sprite, ()):
+            bucket = self.d[key]
+            bucket.discard(sprite)
+            if not bucket:
+                del self.d[key]
+
+    def update(self, sprite):
+        cells = self.cells_for(sprite.rect)
+        if cells == self.sprite_cells.get(sprite):
+            return  # Still in the same buckets, nothing to move
+        self.remove(sprite)
+        self.insert(sprite, cells)
+
+    def query_rect(self, rect):
+        found = set()
+        for key in self.cells_for(rect):
+            bucket = self.d.get(key)
+            if bucket:
+                found.update(bucket)
+        return found
+
+    def empty_cells(self, width, height):
+        """ Cells covering a width x height area from the origin that hold no sprites. """
+        cell = self.cell
+        return [(cx, cy) for cx in range(width // cell + 1) for cy in range(height // cell + 1) if (cx, cy) not in self.d]
+
+    def clear(self):
+        self.d.clear()
+        self.sprite_cells.clear()
+
+class Player(pygame.sprite.DirtySprite):
     def __init__(self):
         super().__init__()
-        self.image = pygame.Surface((50, 50))
-        self.image.fill(GREEN)
+        self.color = GREEN
+        self.size = 50
+        self.base_size = self.size
+        self._base = pygame.Surface((PLAYER_SURFACE_SIZE, PLAYER_SURFACE_SIZE))
+        self._base.fill(self.color)
+        self.base_image = self._base.subsurface((0, 0, self.size, self.size))
+        self.image = self.base_image
         self.rect = self.image.get_rect()
         self.rect.center = (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
         self.speed = 5
-        self.size = 50
+        self.dirty = 2  # Always redraw, the player moves and resizes frequently
 
     def move(self, x, y):
         self.rect.x += x * self.speed
         self.rect.y -= y * self.speed  # Invert y for correct screen coordinates
-        self.rect.clamp_ip(screen.get_rect())
+        self.rect.clamp_ip(SCREEN_RECT)
+
+    def set_size(self, size):
+        self.size = size
+        self.base_size = size
+        # Subsurfaces share the backing pixels, so growing needs no new allocation or fill.
+        # The player is a single colour and only shown unscaled below the zoom threshold, so
+        # past the backing size a capped base scales to the same pixels as a full-size one.
+        side = min(size, PLAYER_SURFACE_SIZE)
+        self.base_image = self._base.subsurface((0, 0, side, side))
+        if zoom_for_player_size(size) == current_zoom:
+            apply_zoom(self)  # Otherwise adjust_zoom rescales the player at the new zoom
 
     def grow(self, value=1):
-        self.size += 5 * value
-        self.image = pygame.Surface((self.size, self.size))
-        self.image.fill(GREEN)
-        self.rect = self.image.get_rect(center=self.rect.center)
+        self.set_size(self.size + 5 * value)
 
 def scale_down_and_spawn_enemy():
     scaling_factor = 0.9  # Example scaling for noticeable effect
@@ -154,156 +237,212 @@ def scale_down_and_spawn_enemy():
 
     spawn_new_enemy()
 
-def adjust_zoom():
+def zoom_for_player_size(size):
     target_size_percentage = 0.15  # Target size of the player as a percentage of screen width
-    actual_percentage = player.rect.width / SCREEN_WIDTH
-    if actual_percentage > target_size_percentage:
-        zoom_factor = target_size_percentage / actual_percentage
-        # Adjust sizes and positions of all sprites
-        for sprite in all_sprites:
-            old_center = sprite.rect.center  # Store the old center
-            sprite.rect.width = int(sprite.rect.width * zoom_factor)
-            sprite.rect.height = int(sprite.rect.height * zoom_factor)
-            sprite.image = pygame.transform.scale(sprite.image, (sprite.rect.width, sprite.rect.height))
-            sprite.rect.center = old_center  # Reset center to keep position consistent
+    return min(1.0, target_size_percentage * SCREEN_WIDTH / size)
+
+def adjust_zoom():
+    global current_zoom
+    zoom = zoom_for_player_size(player.base_size)
+    if zoom == current_zoom:
+        return  # Images are already scaled for this zoom level
+
+    current_zoom = zoom
+    # Entries for the old zoom will never be hit again, so drop them
+    scaled_image_cache.clear()
+    # Adjust sizes of all sprites, keeping their centers in place
+    for sprite in all_sprites:
+        apply_zoom(sprite)
 
+    if current_zoom < 1.0:
         # Ensure the player remains properly positioned at the center
         player.rect.center = (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
 
 
 
 def spawn_new_enemy():
-    new_enemy = Enemy()
-    new_enemy.size = random.randint(60, 100)  # Set a random size
-    new_enemy.image = pygame.Surface((new_enemy.size, new_enemy.size))
-    new_enemy.image.fill(RED)
-    new_enemy.rect = new_enemy.image.get_rect()
+    new_enemy = Enemy()  # Enemy picks its own random size
     place_enemy_safely(new_enemy)
-    enemies.add(new_enemy)
+    enemies.append(new_enemy)
+    enemy_hash.insert(new_enemy)
     all_sprites.add(new_enemy)
-    logging.debug(f"New enemy spawned, size: {new_enemy.size}")
+    if _DBG:
+        logger.debug("New enemy spawned, size: %s", new_enemy.size)
+
+def enemy_spot_is_safe(enemy):
+    enemy_rect = enemy.rect
+    if enemy_rect.colliderect(player.rect):
+        return False
+    nearby_rects = [other.rect for other in enemy_hash.query_rect(enemy_rect) if other is not enemy]
+    return enemy_rect.collidelist(nearby_rects) == -1
 
 def place_enemy_safely(enemy):
     """ Place new enemy ensuring it doesn't overlap with the player or other enemies. """
-    placed = False
-    while not placed:
-        enemy.rect.x = random.randint(0, SCREEN_WIDTH - enemy.rect.width)
-        enemy.rect.y = random.randint(0, SCREEN_HEIGHT - enemy.rect.height)
-        if not pygame.sprite.collide_rect(player, enemy) and not any(pygame.sprite.collide_rect(enemy, other) for other in enemies if other != enemy):
-            placed = True
-
-class Food(pygame.sprite.Sprite):
+    enemy_rect = enemy.rect
+    max_x = SCREEN_WIDTH - enemy_rect.width
+    max_y = SCREEN_HEIGHT - enemy_rect.height
+    for _ in range(PLACEMENT_ATTEMPTS):
+        enemy_rect.x = random.randint(0, max_x)
+        enemy_rect.y = random.randint(0, max_y)
+        if enemy_spot_is_safe(enemy):
+            return
+
+    # The board is crowded, try the empty grid cells in random order instead
+    cell = enemy_hash.cell
+    empty_cells = enemy_hash.empty_cells(SCREEN_WIDTH, SCREEN_HEIGHT)
+    random.shuffle(empty_cells)
+    for cx, cy in empty_cells:
+        enemy_rect.x = min(cx * cell, max_x)
+        enemy_rect.y = min(cy * cell, max_y)
+        if enemy_spot_is_safe(enemy):
+            return
+    logger.debug("No safe spot found for new enemy, leaving it where it is")
+
+class Food(pygame.sprite.DirtySprite):
     def __init__(self, value=1):
         super().__init__()
-        self.image = pygame.Surface((20, 20))
-        self.image.fill(WHITE)
+        self.color = WHITE
+        self.base_size = 20
+        self.base_image = pygame.Surface((self.base_size, self.base_size))
+        self.base_image.fill(self.color)
+        self.image = self.base_image
         self.rect = self.image.get_rect()
         self.rect.x = random.randint(0, SCREEN_WIDTH - 20)
         self.rect.y = random.randint(0, SCREEN_HEIGHT - 20)
+        apply_zoom(self)
         self.speed = 1  # Add speed attribute
-        self.direction = random.choice([(1, 0), (-1, 0), (0, 1), (0, -1)])  # Random initial direction
+        self.direction = DIRECTIONS[random.getrandbits(2)]  # Random initial direction
         self.value = value  # Nutritional value of the food
-
-    def update(self):
-        self.rect.x += self.direction[0] * self.speed
-        self.rect.y += self.direction[1] * self.speed
-
-        # Bounce off walls
-        if self.rect.left < 0 or self.rect.right > SCREEN_WIDTH:
-            self.direction = (-self.direction[0], self.direction[1])
-        if self.rect.top < 0 or self.rect.bottom > SCREEN_HEIGHT:
-            self.direction = (self.direction[0], -self.direction[1])
+        self.dirty = 2  # Always redraw, food moves every frame
 
             
-class Enemy(pygame.sprite.Sprite):
+class Enemy(pygame.sprite.DirtySprite):
     def __init__(self):
         super().__init__()
         self.size = random.randint(60, 100)
-        self.image = pygame.Surface((self.size, self.size))
-        self.image.fill(RED)
+        self.color = RED
+        self.base_size = self.size
+        self.base_image = pygame.Surface((self.size, self.size))
+        self.base_image.fill(self.color)
+        self.image = self.base_image
         self.rect = self.image.get_rect()
         self.rect.x = random.randint(0, SCREEN_WIDTH - self.size)
         self.rect.y = random.randint(0, SCREEN_HEIGHT - self.size)
+        apply_zoom(self)
         self.is_converted = False
         self.speed = 2
-        self.direction = random.choice([(1, 0), (-1, 0), (0, 1), (0, -1)])
+        self.direction = DIRECTIONS[random.getrandbits(2)]
+        self.dirty = 2  # Always redraw, enemies move every frame
 
     def update(self):
         # Check if should be converted to food
         if player.size > self.size and not self.is_converted:
             self.is_converted = True
-            self.image.fill(YELLOW)  # Change color to yellow to indicate it's now food
+            # Change color to yellow to indicate it's now food; scaled images are shared, so swap rather than fill
+            self.color = YELLOW
+            self.base_image = pygame.Surface((self.size, self.size))
+            self.base_image.fill(self.color)
+            apply_zoom(self)
             self.speed = 1  # Make the converted enemy move like food
-            self.direction = random.choice([(1, 0), (-1, 0), (0, 1), (0, -1)])  # Give it a random direction
+            self.direction = DIRECTIONS[random.getrandbits(2)]  # Give it a random direction
 
         # Movement logic
         if self.is_converted:
-            self.rect.x += self.direction[0] * self.speed
-            self.rect.y += self.direction[1] * self.speed
-            # Bounce off walls
-            if self.rect.left < 0 or self.rect.right > SCREEN_WIDTH:
-                self.direction = (-self.direction[0], self.direction[1])
-            if self.rect.top < 0 or self.rect.bottom > SCREEN_HEIGHT:
-                self.direction = (self.direction[0], -self.direction[1])
+            move_bouncing(self)
         else:
-            self.rect.x += random.choice([-1, 1]) * self.speed
-            self.rect.y += random.choice([-1, 1]) * self.speed
+            self.rect.x += JITTER_STEPS[random.getrandbits(1)] * self.speed
+            self.rect.y += JITTER_STEPS[random.getrandbits(1)] * self.speed
+
+        self.rect.clamp_ip(SCREEN_RECT)
+
 
-        self.rect.clamp_ip(screen.get_rect())
 
 
 
+def move_bouncing(sprite):
+    """ Move a food-like sprite along its direction, bouncing off the walls. """
+    rect = sprite.rect
+    dx, dy = sprite.direction
+    speed = sprite.speed
+    rect.move_ip(dx * speed, dy * speed)
 
+    # Bounce off walls
+    bounced = False
+    if rect.left < 0 or rect.right > SCREEN_WIDTH:
+        dx = -dx
+        bounced = True
+    if rect.top < 0 or rect.bottom > SCREEN_HEIGHT:
+        dy = -dy
+        bounced = True
+    if bounced:
+        sprite.direction = (dx, dy)
 
 def spawn_player_safely():
-    safe = False
-    while not safe:
+    enemy_rects = [enemy.rect for enemy in enemies]
+    for _ in range(PLACEMENT_ATTEMPTS):
         player.rect.center = (random.randint(50, SCREEN_WIDTH - 50), random.randint(50, SCREEN_HEIGHT - 50))
-        safe = True
-        for enemy in enemies:
-            if pygame.sprite.collide_rect(player, enemy):
-                safe = False
-                break
+        if player.rect.collidelist(enemy_rects) == -1:
+            return
+
+    # The board is crowded, try the centers of empty grid cells in random order instead
+    cell = enemy_hash.cell
+    empty_cells = enemy_hash.empty_cells(SCREEN_WIDTH, SCREEN_HEIGHT)
+    random.shuffle(empty_cells)
+    for cx, cy in empty_cells:
+        center_x = min(max(cx * cell + cell // 2, 50), SCREEN_WIDTH - 50)
+        center_y = min(max(cy * cell + cell // 2, 50), SCREEN_HEIGHT - 50)
+        player.rect.center = (center_x, center_y)
+        if player.rect.collidelist(enemy_rects) == -1:
+            return
+    logger.debug("No safe spot found for player, leaving it where it is")
 
 def reset_game():
     global game_over
     spawn_player_safely()
-    player.size = 50
-    player.image = pygame.Surface((player.size, player.size))
-    player.image.fill(GREEN)
+    player.set_size(50)
 
-    foods.empty()
-    enemies.empty()
+    foods.clear()
+    enemies.clear()
+    enemy_hash.clear()
     all_sprites.empty()
     all_sprites.add(player)
 
     for _ in range(5):
         food = Food()
-        foods.add(food)
+        foods.append(food)
         all_sprites.add(food)
 
     for _ in range(3):
         enemy = Enemy()
-        enemies.add(enemy)
+        enemies.append(enemy)
+        enemy_hash.insert(enemy)
         all_sprites.add(enemy)
 
     game_over = False
-    logging.info("Game reset, total food items: {}, total enemies: {}".format(len(foods), len(enemies)))
+    logger.info("Game reset, total food items: %s, total enemies: %s", len(foods), len(enemies))
 
 def process_events():
     global running
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-            stop_event.set()
-
-def handle_joystick_input(button_states, data_queue):
-    while not data_queue.empty():
-        data = data_queue.get_nowait()
-        if data:
-            joystick_x, joystick_y, joystick_z = parse_joystick(data, button_states)
-            if not game_over:
-                player.move(joystick_x, joystick_y)
+    # Pump once per frame, pull only the event types we handle and drop the rest
+    pygame.event.pump()
+    quit_events = pygame.event.get(pygame.QUIT, pump=False)
+    pygame.event.clear(pump=False)
+    if quit_events:
+        running = False
+
+def handle_joystick_input(button_states, button_mask, device):
+    # Poll without blocking and keep only the newest report buffered since last frame
+    latest = None
+    data = device.read(33)  # Adjust the number of bytes per XK-12 specification
+    while data:
+        latest = data
+        data = device.read(33)
+    if latest is None:
+        return button_mask
+    joystick_x, joystick_y, joystick_z, button_mask = parse_joystick(latest, button_states, button_mask)
+    if not game_over:
+        player.move(joystick_x, joystick_y)
+    return button_mask
 
 def handle_reset_game(button_states):
     if button_states[0] == "Pressed":
@@ -313,74 +452,98 @@ def handle_reset_game(button_states):
             reset_game()
 
 def handle_food_collisions():
-    collided_foods = pygame.sprite.spritecollide(player, foods, True)
+    hit_indices = player.rect.collidelistall([food.rect for food in foods])
+    if not hit_indices:
+        return
+    collided_foods = [foods[index] for index in hit_indices]
+    for index in reversed(hit_indices):
+        del foods[index]
     for food in collided_foods:
+        food.kill()  # Remove it from all_sprites
         player.grow(food.value)  # Grow based on food value
-        logging.debug(f"Food eaten, value: {food.value}, player size: {player.size}")
+        if _DBG:
+            logger.debug("Food eaten, value: %s, player size: %s", food.value, player.size)
         # Only add new food if we are below the limit
         if len(foods) < MAX_FOOD_ITEMS:
             new_food = Food()
-            foods.add(new_food)
+            foods.append(new_food)
             all_sprites.add(new_food)
-            logging.debug(f"New food added, total food items: {len(foods)}")
-        else:
-            logging.debug("Food limit reached, not adding new food")
+            if _DBG:
+                logger.debug("New food added, total food items: %s", len(foods))
+        elif _DBG:
+            logger.debug("Food limit reached, not adding new food")
 
-def handle_enemy_collisions():
+def update_enemies():
+    """ Single pass over the enemies: move them, rebucket them and resolve player contact. """
     global game_over
+    player_rect = player.rect
+    eaten = []
     for enemy in enemies:
-        if pygame.sprite.collide_rect(player, enemy) and not enemy.is_converted:
-            game_over = True
-            logging.info("Game Over")
-
-
+        enemy.update()
+        enemy_hash.update(enemy)
+        if player_rect.colliderect(enemy.rect):
+            if enemy.is_converted:
+                eaten.append(enemy)
+            else:
+                game_over = True
+                logger.info("Game Over")
+
+    # Remove eaten enemies after the loop so the list isn't mutated while iterating
+    if eaten:
+        enemies[:] = [enemy for enemy in enemies if enemy not in eaten]
+        for enemy in eaten:
+            enemy_hash.remove(enemy)
+            all_sprites.remove(enemy)
+            if _DBG:
+                logger.debug("Enemy eaten")
 
-def update_game_state(button_states, data_queue):
+def update_game_state(button_states, button_mask, device):
     global game_over
-    handle_joystick_input(button_states, data_queue)
+    button_mask = handle_joystick_input(button_states, button_mask, device)
     handle_reset_game(button_states)
     handle_food_collisions()
-    handle_enemy_collisions()
 
-    # Update all sprites
-    all_sprites.update()
-    # Adjust game zoom
+    # Update sprites; the player only moves on joystick input
+    for food in foods:
+        move_bouncing(food)
+    # Adjust game zoom before enemies are tested against the player's rect
     adjust_zoom()
+    update_enemies()
 
-    # Check for eaten enemies and potentially spawn new ones
-    for enemy in list(enemies):
-        if enemy.is_converted and pygame.sprite.collide_rect(player, enemy):
-            enemies.remove(enemy)
-            all_sprites.remove(enemy)
-            logging.debug("Enemy eaten")
-    
     # Maintain three enemies on the field
     while len(enemies) < 3:
         spawn_new_enemy()
+    return button_mask
 
 
 
 def draw_game():
-    screen.fill(BLACK)
-    all_sprites.draw(screen)
-    pygame.display.flip()
+    # Only the areas sprites left or now cover are repainted and pushed to the display
+    dirty_rects = all_sprites.draw(screen)
+    pygame.display.update(dirty_rects)
 
 def initialize_game():
-    global player, all_sprites, foods, enemies, game_over
+    global player, all_sprites, foods, enemies, enemy_hash, game_over
 
     player = Player()
-    all_sprites = pygame.sprite.Group(player)
-    foods = pygame.sprite.Group()
-    enemies = pygame.sprite.Group()
+    all_sprites = pygame.sprite.LayeredDirty(player)
+    background = pygame.Surface(screen.get_size())
+    background.fill(BLACK)
+    all_sprites.clear(screen, background)  # Erase vacated sprite areas with this instead of filling the screen
+    # Plain lists for the hot-path collections; all_sprites is only kept for drawing
+    foods = []
+    enemies = []
+    enemy_hash = SpatialHash()
 
     for _ in range(5):
         food = Food()
-        foods.add(food)
+        foods.append(food)
         all_sprites.add(food)
 
     for _ in range(3):
         enemy = Enemy()
-        enemies.add(enemy)
+        enemies.append(enemy)
+        enemy_hash.insert(enemy)
         all_sprites.add(enemy)
 
     # Spawn player in a safe place
@@ -391,29 +554,25 @@ def initialize_game():
 def main():
     try:
         device = open_device()
-        data_queue = queue.Queue()
-        stop_event = threading.Event()
-        read_thread = threading.Thread(target=device_read_thread, args=(device, data_queue, stop_event))
-        read_thread.start()
 
         global running
         running = True
         button_states = [None] * 12  # Initialize button states
+        button_mask = 0  # Packed button bits from the previous report, bit i is button i + 1
 
         initialize_game()
 
         while running:
             process_events()
-            update_game_state(button_states, data_queue)
+            button_mask = update_game_state(button_states, button_mask, device)
             draw_game()
             clock.tick(FPS)
 
-        read_thread.join()
         device.close()
         pygame.quit()
 
     except Exception as e:
-        logging.error(f"An error occurred: {e}")
+        logger.error("An error occurred: %s", e)
 
 if __name__ == "__main__":
     main()
@@ -1,7 +1,8 @@
 import pygame
 import hid
 import threading
-import queue
+import array
+import collections
 import math
 import random
 import sys
@@ -11,11 +12,93 @@ import json
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
 FPS = 60
+PHYSICS_HZ = 120  # Fixed rate at which input is drained and sprites are stepped
+PHYSICS_STEP = 1.0 / PHYSICS_HZ
+STEP_SCALE = FPS / PHYSICS_HZ  # Speeds are tuned per 60 FPS frame, scale them to one physics step
+MAX_PHYSICS_STEPS = 8  # Cap per rendered frame so a long stall can't snowball into more work
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
 RED = (255, 0, 0)
 GREEN = (0, 255, 0)
 YELLOW = (255, 255, 0)
+DEBUG = False  # Print button presses for diagnostics; print() is too slow for the input path by default
+FIRE_BUTTON = 1 << 0  # Button 1
+RESTART_BUTTON = 1 << 1  # Button 2
+DIRTY_RECT_LIMIT = 50  # Above this many dirty rects a full flip is cheaper than update()
+DIRTY_AREA_LIMIT = SCREEN_WIDTH * SCREEN_HEIGHT * 0.4  # Likewise once this much of the screen is dirty
+HID_READ_TIMEOUT_MS = 50  # Blocking read timeout; also bounds how long shutdown waits on the reader
+TURRET_EPSILON = 1e-3  # Twist change below this keeps the cached turret direction
+
+class SPSCRing:
+    """Lock-free single-producer/single-consumer ring of preallocated HID report buffers.
+
+    Only the reader thread writes tail and only the game loop writes head, and
+    CPython stores each counter atomically, so neither side needs a lock.
+    """
+    def __init__(self, size=64, report_size=33):
+        if size & (size - 1):
+            raise ValueError("SPSCRing size must be a power of two")
+        self.size = size
+        self.mask = size - 1
+        self.buf = [bytearray(report_size) for _ in range(size)]
+        self.head = array.array('Q', [0])
+        self.tail = array.array('Q', [0])
+
+    def push(self, data):
+        t = self.tail[0]
+        if t - self.head[0] >= self.size:
+            return False  # Consumer is behind, drop the report rather than block
+        self.buf[t & self.mask][:] = data
+        self.tail[0] = t + 1
+        return True
+
+    def peek(self):
+        h = self.head[0]
+        if h == self.tail[0]:
+            return None
+        return self.buf[h & self.mask]
+
+    def advance(self):
+        self.head[0] += 1
+
+class Grid:
+    """Spatial hash of sprites keyed on the 32px cell holding each sprite's center.
+
+    A query looks at the 3x3 cells around a point, which finds every overlap as
+    long as the two sprites' half-extents add up to no more than one cell.
+    """
+    def __init__(self, cell_shift=5):
+        self.cell_shift = cell_shift  # Cell size is 1 << cell_shift
+        self.cells = collections.defaultdict(list)
+
+    def cell_of(self, rect):
+        return rect.centerx >> self.cell_shift, rect.centery >> self.cell_shift
+
+    def insert(self, sprite):
+        sprite._cx, sprite._cy = cell = self.cell_of(sprite.rect)
+        self.cells[cell].append(sprite)
+
+    def remove(self, sprite):
+        bucket = self.cells.get((sprite._cx, sprite._cy))
+        if bucket and sprite in bucket:
+            bucket.remove(sprite)
+
+    def move(self, sprite):
+        cell = self.cell_of(sprite.rect)
+        if cell == (sprite._cx, sprite._cy):
+            return  # Still in the same cell, no rehash needed
+        self.remove(sprite)
+        self.insert(sprite)
+
+    def nearby(self, rect):
+        cx, cy = self.cell_of(rect)
+        found = []
+        for x in (cx - 1, cx, cx + 1):
+            for y in (cy - 1, cy, cy + 1):
+                bucket = self.cells.get((x, y))
+                if bucket:
+                    found.extend(bucket)
+        return found
 
 class JoystickHandler:
     def __init__(self):
@@ -25,10 +108,14 @@ class JoystickHandler:
             print("Device not found. Exiting...")
             sys.exit()
         self.device = self.open_device()
-        self.data_queue = queue.Queue()
+        self.reports = SPSCRing()
         self.stop_event = threading.Event()
-        self.button_states = ['Released'] * 12
-        threading.Thread(target=self.device_read_thread, daemon=True).start()
+        self.button_mask = 0  # Bit n - 1 set while button n is held
+        self.axes = (0.0, 0.0, 0.0)  # Normalized x, y, z from the newest report, held until the next one
+        self._col_tables = self.build_column_tables()
+        self._norm_lut = array.array('f', [self.normalize_joystick_value(v) for v in range(256)])
+        self.read_thread = threading.Thread(target=self.device_read_thread, daemon=True)
+        self.read_thread.start()
         print("JoystickHandler initialized.")
 
     def find_device(self, vid, pid):
@@ -51,9 +138,10 @@ class JoystickHandler:
     def device_read_thread(self):
         while not self.stop_event.is_set():
             try:
-                data = self.device.read(33)
-                if data:
-                    self.data_queue.put(data)
+                data = self.device.read(33, HID_READ_TIMEOUT_MS)
+                if not data:
+                    continue  # Timed out, recheck stop_event
+                self.reports.push(data)  # A buffered report returns at once, so a backlog needs no extra reads
             except Exception as e:
                 print(f"Error reading device: {e}")
                 break
@@ -65,33 +153,49 @@ class JoystickHandler:
         else:
             return value / 127
 
-    def parse_joystick(self, data):
-        button_map = {0: [1, 5, 9], 1: [2, 6, 10], 2: [3, 7, 11], 3: [4, 8, 12]}
-        pressed_buttons = []
+    def build_column_tables(self):
+        # _col_tables[c][b] is the button mask held when column byte c (data[2 + c]) reads b;
+        # bit `bit` of column c is button c + 1 + 4 * bit
+        tables = []
         for column in range(4):
-            byte_value = data[2 + column]
-            for bit in range(3):
-                button_index = button_map[column][bit] - 1
-                if byte_value & (1 << bit):
-                    if self.button_states[button_index] != "Pressed":
-                        self.button_states[button_index] = "Pressed"
-                        pressed_buttons.append(button_map[column][bit])
-                        print(f"Button {button_map[column][bit]} pressed")
-                else:
-                    if self.button_states[button_index] == "Pressed":
-                        self.button_states[button_index] = "Released"
-        raw_x, raw_y, raw_z = data[6], data[7], data[8]
-        return (self.normalize_joystick_value(raw_x),
-                self.normalize_joystick_value(raw_y),
-                self.normalize_joystick_value(raw_z),
-                pressed_buttons)
+            table = [0] * 256
+            for value in range(256):
+                for bit in range(3):
+                    if value & (1 << bit):
+                        table[value] |= 1 << (column + 4 * bit)
+            tables.append(tuple(table))
+        return tuple(tables)
+
+    def parse_joystick(self, data):
+        t0, t1, t2, t3 = self._col_tables
+        mask = t0[data[2]] | t1[data[3]] | t2[data[4]] | t3[data[5]]
+        pressed_mask = mask & ~self.button_mask
+        released_mask = self.button_mask & ~mask
+        self.button_mask = mask
+        if DEBUG:
+            newly_pressed = pressed_mask
+            while newly_pressed:
+                print(f"Button {(newly_pressed & -newly_pressed).bit_length()} pressed")
+                newly_pressed &= newly_pressed - 1
+        norm = self._norm_lut
+        self.axes = (norm[data[6]], norm[data[7]], norm[data[8]])
+        return (*self.axes, pressed_mask, released_mask)
 
 class Game:
     def __init__(self):
         pygame.init()
+        # The display must exist before any sprite is built, their surfaces are converted to its format
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        # QUIT is the only event handled, so drop everything else before it reaches the queue
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed([pygame.QUIT])
         self.clock = pygame.time.Clock()
         self.font = pygame.font.Font(None, 36)
+        # Rendered HUD text, keyed on the value shown so it is only re-rasterized on change
+        self._score_cache = (-1, None)
+        self._lives_cache = (-1, None)
+        self.game_over_text = self.font.render("Game Over! Press Button 2 to Restart", True, RED).convert_alpha()
+        self._prev_rects = []  # Screen areas drawn last frame, erased before drawing the next one
         self.is_game_over = False
         self.load_round_data()
         self.reset_game()
@@ -120,11 +224,14 @@ class Game:
         round_data = self.rounds[round_index]
         enemy_color = round_data["enemy_color"]
         self.asteroids = pygame.sprite.Group(Asteroid(color=enemy_color) for _ in range(10))
+        self.asteroid_grid = Grid()
+        for asteroid in self.asteroids:
+            self.asteroid_grid.insert(asteroid)
         self.player = Player(self.screen)
 
 
     def check_round_completion(self):
-        if not self.asteroids:  # Checks if the group is empty
+        if len(self.asteroids) == 0:  # Checks if the group is empty
             if self.current_round_index < len(self.rounds) - 1:
                 self.current_round_index += 1
             else:
@@ -132,58 +239,96 @@ class Game:
             self.setup_round(self.current_round_index)
             
     def run(self):
+        accumulator = 0.0
         while True:
             self.handle_events()
-            self.update_game_state()
+            # Step input and physics at PHYSICS_HZ no matter how long rendering takes
+            accumulator = min(accumulator + self.clock.tick(FPS) / 1000.0, PHYSICS_STEP * MAX_PHYSICS_STEPS)
+            while accumulator >= PHYSICS_STEP:
+                self.update_game_state()
+                accumulator -= PHYSICS_STEP
             self.render_game()
-            self.check_round_completion()
-            pygame.display.flip()
-            self.clock.tick(FPS)
             
 
 
     def handle_collisions(self):
-        # Check collisions between player and asteroids
-        if pygame.sprite.spritecollide(self.player, self.asteroids, True):
+        grid = self.asteroid_grid
+
+        # Check collisions between player and asteroids; the player is too big for the
+        # grid's 3x3 neighbourhood, so sweep all asteroid rects in one C-level call
+        asteroids = self.asteroids.sprites()
+        hits = self.player.rect.collidelistall([asteroid.rect for asteroid in asteroids])
+        if hits:
+            for index in hits:
+                asteroids[index].kill()
+                grid.remove(asteroids[index])
             self.player.lose_life()
 
-        # Check for bullet collisions with asteroids
-        for bullet in self.player.bullets:
-            if pygame.sprite.spritecollide(bullet, self.asteroids, True):
+        # Check for bullet collisions with asteroids, only against asteroids in nearby cells
+        for bullet in self.player.bullets.sprites():
+            hit = [asteroid for asteroid in grid.nearby(bullet.rect) if bullet.rect.colliderect(asteroid.rect)]
+            if hit:
+                for asteroid in hit:
+                    asteroid.kill()
+                    grid.remove(asteroid)
                 self.score += 100  # Update the score for each asteroid hit
                 bullet.kill()  # Remove the bullet
 
     def update_game_state(self):
-        if not self.joystick.data_queue.empty():
-            data = self.joystick.data_queue.get()
-            joystick_x, joystick_y, joystick_z, pressed_buttons = self.joystick.parse_joystick(data)
-            if not self.is_game_over:  # Only update player if game is not over
-                self.player.update(joystick_x, joystick_y, joystick_z, pressed_buttons)
+        # Drain every queued report: button presses from all of them are OR'd together so a
+        # quick tap between steps isn't lost, and parse_joystick keeps the newest axes
+        reports = self.joystick.reports
+        pressed_mask = 0
+        data = reports.peek()
+        while data is not None:
+            pressed_mask |= self.joystick.parse_joystick(data)[3]
+            reports.advance()  # Slot may be reused by the reader thread from here on
+            data = reports.peek()
+        if not self.is_game_over:  # Only update player if game is not over
+            # Move on every step with the held axes, most steps in a frame see no new report
+            joystick_x, joystick_y, joystick_z = self.joystick.axes
+            self.player.update(joystick_x, joystick_y, joystick_z, pressed_mask)
         
         if self.is_game_over:
-            if 2 in pressed_buttons:  # Check if button 2 is pressed
+            if pressed_mask & RESTART_BUTTON:  # Check if button 2 is pressed
                 print("Restarting game on button 2 press.")
                 self.reset_game()
 
         self.asteroids.update()
+        for asteroid in self.asteroids:
+            self.asteroid_grid.move(asteroid)
         self.handle_collisions()  # Ensure collisions are checked outside the game over condition
         self.check_round_completion()
         self.player.bullets.update()
 
 
     def render_game(self):
-        self.screen.fill(BLACK)
+        # Erase only what was drawn last frame; the rest of the screen is already black
+        for rect in self._prev_rects:
+            self.screen.fill(BLACK, rect)
+
+        new_rects = []
         if not self.is_game_over:
-            self.asteroids.draw(self.screen)
-            self.player.draw(self.screen)
+            new_rects.extend(self.screen.blits([(asteroid.image, asteroid.rect) for asteroid in self.asteroids]))
+            new_rects.extend(self.player.draw(self.screen))
             # Score and lives display
-            score_text = self.font.render(f"Score: {self.score}", True, WHITE)
-            self.screen.blit(score_text, (10, 10))
-            lives_text = self.font.render(f"Lives: {self.player.lives}", True, WHITE)
-            self.screen.blit(lives_text, (SCREEN_WIDTH - 100, 10))
+            if self._score_cache[0] != self.score:
+                self._score_cache = (self.score, self.font.render(f"Score: {self.score}", True, WHITE).convert_alpha())
+            new_rects.append(self.screen.blit(self._score_cache[1], (10, 10)))
+            if self._lives_cache[0] != self.player.lives:
+                self._lives_cache = (self.player.lives, self.font.render(f"Lives: {self.player.lives}", True, WHITE).convert_alpha())
+            new_rects.append(self.screen.blit(self._lives_cache[1], (SCREEN_WIDTH - 100, 10)))
         else:
-            game_over_text = self.font.render("Game Over! Press Button 2 to Restart", True, RED)
-            self.screen.blit(game_over_text, (SCREEN_WIDTH // 2 - game_over_text.get_width() // 2, SCREEN_HEIGHT // 2))
+            game_over_text = self.game_over_text
+            new_rects.append(self.screen.blit(game_over_text, (SCREEN_WIDTH // 2 - game_over_text.get_width() // 2, SCREEN_HEIGHT // 2)))
+
+        # Push only the erased and newly drawn areas, unless so much changed that a flip is cheaper
+        dirty_rects = self._prev_rects + new_rects
+        if len(dirty_rects) > DIRTY_RECT_LIMIT or sum(rect.w * rect.h for rect in dirty_rects) > DIRTY_AREA_LIMIT:
+            pygame.display.flip()
+        else:
+            pygame.display.update(dirty_rects)
+        self._prev_rects = new_rects
             
     def display_game_over_screen(self):
         self.screen.fill(BLACK)
@@ -191,24 +336,37 @@ class Game:
         self.screen.blit(game_over_text, (SCREEN_WIDTH // 2 - game_over_text.get_width() // 2, SCREEN_HEIGHT // 2))
         
     def handle_events(self):
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                self.joystick.stop_event.set()
-                self.joystick.device.close()
-                pygame.quit()
-                sys.exit()
+        if pygame.event.peek(pygame.QUIT):
+            self.shutdown()
+        # peek() already pumped; pumping again here could drop a QUIT that arrived in between
+        pygame.event.clear(pump=False)
+
+    def shutdown(self):
+        self.joystick.stop_event.set()
+        # Let the reader finish its current timed read, closing the device under it is unsafe
+        self.joystick.read_thread.join()
+        self.joystick.device.close()
+        pygame.quit()
+        sys.exit()
 
 
 class Player(pygame.sprite.Sprite):
+    _surface = None  # Shared by every Player, a new one is created each round
+
     def __init__(self, screen):
         super().__init__()
         self.screen = screen  # Store the screen as an attribute
-        self.image = pygame.Surface((50, 50), pygame.SRCALPHA)
-        self.image.fill(GREEN)
+        if Player._surface is None:
+            Player._surface = pygame.Surface((50, 50), pygame.SRCALPHA).convert_alpha()
+            Player._surface.fill(GREEN)
+        self.image = Player._surface
         self.rect = self.image.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
+        self.pos_x, self.pos_y = float(self.rect.centerx), float(self.rect.centery)  # Sub-pixel position
         self.turret_angle = 0
+        self._turret_z = 0.0
+        self._turret_cos, self._turret_sin = 1.0, 0.0  # Cached direction of turret_angle
         self.bullets = pygame.sprite.Group()
-        self.speed = 5
+        self.speed = 5 * STEP_SCALE  # Tuned per 60 FPS frame, applied per physics step
         self.lives = 3
         self.is_game_over = False
     
@@ -219,66 +377,98 @@ class Player(pygame.sprite.Sprite):
             self.kill()
             self.is_game_over = True
 
-    def update(self, joystick_x, joystick_y, joystick_z, button_states):
-        self.rect.x += int(joystick_x * self.speed)
-        self.rect.y += int(joystick_y * self.speed)
+    def update(self, joystick_x, joystick_y, joystick_z, pressed_mask):
+        self.pos_x += joystick_x * self.speed
+        self.pos_y += joystick_y * self.speed
+        self.rect.center = (round(self.pos_x), round(self.pos_y))
         self.rect.clamp_ip(self.screen.get_rect())
+        if self.rect.center != (round(self.pos_x), round(self.pos_y)):
+            # Clamped against an edge, so don't let the float position run off screen
+            self.pos_x, self.pos_y = float(self.rect.centerx), float(self.rect.centery)
         
-        self.turret_angle = joystick_z * math.pi * 180 / math.pi  # Convert radians to degrees
-        self.turret_angle %= 360
+        # Only redo the angle and trig when the twist actually moved
+        if abs(joystick_z - self._turret_z) > TURRET_EPSILON:
+            self._turret_z = joystick_z
+            self.turret_angle = joystick_z * math.pi * 180 / math.pi  # Convert radians to degrees
+            self.turret_angle %= 360
+            rad_turret_angle = math.radians(self.turret_angle)
+            self._turret_cos, self._turret_sin = math.cos(rad_turret_angle), math.sin(rad_turret_angle)
         
-        if 1 in button_states:
+        if pressed_mask & FIRE_BUTTON:
             self.fire()
 
     def fire(self):
-        bullet = Bullet(self.rect.centerx, self.rect.centery, self.turret_angle, self.screen)  # Pass screen to Bullet
+        bullet = Bullet(self.rect.centerx, self.rect.centery, self.turret_angle)
         self.bullets.add(bullet)
 
     def draw(self, surface):
-        surface.blit(self.image, self.rect)
-        self.bullets.draw(surface)
+        # Returns the rects touched so the caller can update just those areas
+        blit_list = [(self.image, self.rect)]
+        blit_list.extend((bullet.image, bullet.rect) for bullet in self.bullets)
+        rects = surface.blits(blit_list)
         turret_length = 30
-        rad_turret_angle = math.radians(self.turret_angle)
-        tip = (self.rect.centerx + turret_length * math.cos(rad_turret_angle),
-               self.rect.centery + turret_length * math.sin(rad_turret_angle))
-        pygame.draw.line(surface, RED, self.rect.center, tip, 5)
+        tip = (self.rect.centerx + turret_length * self._turret_cos,
+               self.rect.centery + turret_length * self._turret_sin)
+        rects.append(pygame.draw.line(surface, RED, self.rect.center, tip, 5))
+        return rects
 
 
 class Bullet(pygame.sprite.Sprite):
-    def __init__(self, x, y, angle, screen):
+    _surface = None  # Shared by every Bullet
+
+    def __init__(self, x, y, angle):
         super().__init__()
-        self.screen = screen  # Store the screen as an attribute
-        self.image = pygame.Surface((5, 5))
-        self.image.fill(WHITE)
+        if Bullet._surface is None:
+            Bullet._surface = pygame.Surface((5, 5)).convert()
+            Bullet._surface.fill(WHITE)
+        self.image = Bullet._surface
         self.rect = self.image.get_rect(center=(x, y))
+        self.pos_x, self.pos_y = float(x), float(y)  # Sub-pixel position, steps can be under a pixel
         self.speed = 10
         self.angle = angle
+        rad_angle = math.radians(self.angle)
+        self.vx = self.speed * math.cos(rad_angle) * STEP_SCALE
+        self.vy = self.speed * math.sin(rad_angle) * STEP_SCALE
 
     def update(self):
-        rad_angle = math.radians(self.angle)
-        self.rect.x += self.speed * math.cos(rad_angle)
-        self.rect.y += self.speed * math.sin(rad_angle)
-        if not self.screen.get_rect().contains(self.rect):
+        self.pos_x += self.vx
+        self.pos_y += self.vy
+        rect = self.rect
+        rect.center = (round(self.pos_x), round(self.pos_y))
+        # Same as screen.get_rect().contains(rect), without building a Rect per bullet per step
+        if rect.left < 0 or rect.top < 0 or rect.right > SCREEN_WIDTH or rect.bottom > SCREEN_HEIGHT:
             self.kill()
 
 
 class Asteroid(pygame.sprite.Sprite):
+    _surface_cache = {}  # color -> Surface shared by every asteroid of that color
+
     def __init__(self, color):
         super().__init__()
-        self.image = pygame.Surface((30, 30))
-        self.image.fill(color)
+        key = tuple(color)
+        surface = Asteroid._surface_cache.get(key)
+        if surface is None:
+            surface = pygame.Surface((30, 30)).convert()
+            surface.fill(color)
+            Asteroid._surface_cache[key] = surface
+        self.image = surface
         self.rect = self.image.get_rect(center=(random.randint(0, SCREEN_WIDTH), random.randint(0, SCREEN_HEIGHT)))
+        self.pos_x, self.pos_y = float(self.rect.centerx), float(self.rect.centery)  # Sub-pixel position
         self.speed = random.randint(1, 3)
         self.angle = random.randint(0, 360)
+        rad_angle = math.radians(self.angle)
+        self.vx = self.speed * math.cos(rad_angle) * STEP_SCALE
+        self.vy = self.speed * math.sin(rad_angle) * STEP_SCALE
 
     def update(self):
-        rad_angle = math.radians(self.angle)
-        self.rect.x += self.speed * math.cos(rad_angle)
-        self.rect.y += self.speed * math.sin(rad_angle)
+        self.pos_x += self.vx
+        self.pos_y += self.vy
+        self.rect.center = (round(self.pos_x), round(self.pos_y))
+        # Bouncing mirrors the angle, which is just a sign flip of one velocity component
         if self.rect.left <= 0 or self.rect.right >= SCREEN_WIDTH:
-            self.angle = 180 - self.angle
+            self.vx = -self.vx
         if self.rect.top <= 0 or self.rect.bottom >= SCREEN_HEIGHT:
-            self.angle = -self.angle
+            self.vy = -self.vy
 
 
 
@@ -4,6 +4,7 @@ import pygame
 import hid
 import threading
 import queue
+import array
 import math
 import logging
 
@@ -30,6 +31,7 @@ clock = pygame.time.Clock()
 
 # Set up logging
 logging.basicConfig(filename='joystick_debug.log', level=logging.DEBUG, format='%(asctime)s - %(message)s')
+_DEBUG = False  # Enables the per-report debug prints and logging inside the hot HID path
 
 def normalize_joystick_value(value):
     # Normalization to -1 to 1 range
@@ -37,7 +39,8 @@ def normalize_joystick_value(value):
         normalized_value = (value - 256) / 128
     else:
         normalized_value = value / 127
-    logging.debug(f"Normalized joystick value: {normalized_value}")
+    if _DEBUG:
+        logging.debug("Normalized joystick value: %s", normalized_value)
     return normalized_value
 
 def normalize_y_axis(value):
@@ -46,9 +49,14 @@ def normalize_y_axis(value):
         normalized_value = (value - 127) / 127.0  # Downward movement
     else:
         normalized_value = (255 - value) / 128.0  # Upward movement
-    logging.debug(f"Normalized Y-axis value: {normalized_value}")
+    if _DEBUG:
+        logging.debug("Normalized Y-axis value: %s", normalized_value)
     return normalized_value
 
+# Normalized value for every possible raw axis byte, so parsing is a single index
+_NORM_LUT = array.array('f', [normalize_joystick_value(value) for value in range(256)])
+_NORM_Y_LUT = array.array('f', [normalize_y_axis(value) for value in range(256)])
+
 def find_device(vid, pid):
     # Look for the device with the specified Vendor ID and Product ID
     for device_info in hid.enumerate():
@@ -79,32 +87,35 @@ def open_device():
         print(f"Failed to open device: {e}")
         sys.exit()
 
-def parse_joystick(data, button_states):
-    # Interpret bytes for button states
-    button_map = {
-        0: [1, 5, 9],   # Byte 2: Column 1
-        1: [2, 6, 10],  # Byte 3: Column 2
-        2: [3, 7, 11],  # Byte 4: Column 3
-        3: [4, 8, 12]   # Byte 5: Column 4
-    }
-
-    pressed_buttons = []
-
-    for column in range(4):  # Four bytes for columns (D1 to D4)
-        byte_value = data[2 + column]
-        for bit in range(3):  # Each byte has 3 relevant bits
-            button_index = button_map[column][bit] - 1
-            mask = 1 << bit
-            if byte_value & mask:
-                if button_states[button_index] != "Pressed":
-                    button_states[button_index] = "Pressed"
-                    pressed_buttons.append(button_map[column][bit])
-            else:
-                if button_states[button_index] == "Pressed":
-                    button_states[button_index] = "Released"
-    
-    if pressed_buttons:
-        print(" and ".join(map(str, pressed_buttons)) + " pressed")
+def build_column_tables():
+    # COLUMN_TABLES[c][b] is the button mask held when column byte c (D1 to D4, data[2 + c]) reads b;
+    # bit `bit` of column c is button c + 1 + 4 * bit, stored as bit c + 4 * bit of the mask
+    tables = []
+    for column in range(4):
+        table = [0] * 256
+        for value in range(256):
+            for bit in range(3):  # Each byte has 3 relevant bits
+                if value & (1 << bit):
+                    table[value] |= 1 << (column + 4 * bit)
+        tables.append(tuple(table))
+    return tuple(tables)
+
+COLUMN_TABLES = build_column_tables()
+
+def parse_joystick(data, button_mask):
+    # Interpret bytes for button states; bit n - 1 of the mask is set while button n is held
+    t0, t1, t2, t3 = COLUMN_TABLES
+    mask = t0[data[2]] | t1[data[3]] | t2[data[4]] | t3[data[5]]
+    if _DEBUG:
+        # print() takes the stdout lock and can stall a console, keep it off the HID path by default
+        newly_pressed = mask & ~button_mask
+        pressed_buttons = []
+        while newly_pressed:
+            pressed_buttons.append((newly_pressed & -newly_pressed).bit_length())
+            newly_pressed &= newly_pressed - 1
+
+        if pressed_buttons:
+            print(" and ".join(map(str, pressed_buttons)) + " pressed")
 
     # Extract raw X, Y, and Z data
     raw_x = data[6]
@@ -112,19 +123,21 @@ def parse_joystick(data, button_states):
     raw_z = data[8]
 
     # Normalize X, Y, and Z
-    x_normalized = normalize_joystick_value(raw_x)
-    y_normalized = normalize_y_axis(raw_y)  # Invert Y-axis for correct screen coordinates
-    z_normalized = -normalize_joystick_value(raw_z)
-    logging.debug(f"Raw values - X: {raw_x}, Y: {raw_y}, Z: {raw_z}")
-    logging.debug(f"Normalized values - X: {x_normalized}, Y: {y_normalized}, Z: {z_normalized}")
-    return x_normalized, y_normalized, z_normalized
+    x_normalized = _NORM_LUT[raw_x]
+    y_normalized = _NORM_Y_LUT[raw_y]  # Invert Y-axis for correct screen coordinates
+    z_normalized = -_NORM_LUT[raw_z]
+    if _DEBUG:
+        logging.debug("Raw values - X: %s, Y: %s, Z: %s", raw_x, raw_y, raw_z)
+        logging.debug("Normalized values - X: %s, Y: %s, Z: %s", x_normalized, y_normalized, z_normalized)
+    return x_normalized, y_normalized, z_normalized, mask
 
 def draw_joystick(joystick_x, joystick_y, joystick_z):
     joystick_center_x = SCREEN_WIDTH // 2
     joystick_center_y = SCREEN_HEIGHT // 2 - 150  # Move joystick area up
     joystick_pos_x = int(joystick_center_x + joystick_x * JOYSTICK_RADIUS)
     joystick_pos_y = int(joystick_center_y - joystick_y * JOYSTICK_RADIUS)  # Ensure correct direction
-    logging.debug(f"Calculated joystick position - X: {joystick_pos_x}, Y: {joystick_pos_y}")
+    if _DEBUG:
+        logging.debug("Calculated joystick position - X: %s, Y: %s", joystick_pos_x, joystick_pos_y)
 
     # Draw joystick position as a circle
     pygame.draw.circle(screen, GREEN, (joystick_pos_x, joystick_pos_y), 10)
@@ -136,37 +149,60 @@ def draw_joystick(joystick_x, joystick_y, joystick_z):
     pygame.draw.line(screen, RED, (joystick_pos_x, joystick_pos_y), (end_x, end_y), 5)
 
 
-def draw_keyboard(button_states):
-    keyboard_area_top = SCREEN_HEIGHT // 2 + 50  # Place below joystick area
-    keyboard_area_height = 160
-    keyboard_area_width = 210
-    keyboard_area_left = (SCREEN_WIDTH - keyboard_area_width) // 2
-    pygame.draw.rect(screen, DARK_GREY, (keyboard_area_left, keyboard_area_top, keyboard_area_width, keyboard_area_height))
-    pygame.draw.rect(screen, RED, (keyboard_area_left, keyboard_area_top, keyboard_area_width, keyboard_area_height), 2)
+# Keyboard panel geometry, placed below the joystick area
+KEYBOARD_AREA_TOP = SCREEN_HEIGHT // 2 + 50
+KEYBOARD_AREA_HEIGHT = 160
+KEYBOARD_AREA_WIDTH = 210
+KEYBOARD_AREA_LEFT = (SCREEN_WIDTH - KEYBOARD_AREA_WIDTH) // 2
+KEY_WIDTH = 40
+KEY_HEIGHT = 40
 
-    # Draw keys
-    key_width = 40
-    key_height = 40
+def build_keyboard():
+    # Bake everything that never changes (panel, key borders, numbers) into one surface
+    keyboard_bg = pygame.Surface((KEYBOARD_AREA_WIDTH, KEYBOARD_AREA_HEIGHT)).convert()
+    keyboard_bg.fill(DARK_GREY)
+    pygame.draw.rect(keyboard_bg, RED, keyboard_bg.get_rect(), 2)
     font = pygame.font.Font(None, 36)  # Set up font for numbering
 
+    key_rects = []  # Screen coordinates of each key
+    key_labels = []  # (number surface, screen rect) per key, reblitted over the pressed fill
     for i in range(12):
         row = i // 4
         col = i % 4
-        key_left = keyboard_area_left + col * (key_width + 10) + 10
-        key_top = keyboard_area_top + row * (key_height + 10) + 10
-        if button_states[i] == "Pressed":
-            pygame.draw.rect(screen, LIGHT_BLUE, (key_left, key_top, key_width, key_height))
-        pygame.draw.rect(screen, RED, (key_left, key_top, key_width, key_height), 2)
+        key_left = col * (KEY_WIDTH + 10) + 10
+        key_top = row * (KEY_HEIGHT + 10) + 10
+        key_rect = pygame.Rect(key_left, key_top, KEY_WIDTH, KEY_HEIGHT)
+        pygame.draw.rect(keyboard_bg, RED, key_rect, 2)
 
         # Draw button numbers
         text_surface = font.render(str(i + 1), True, WHITE)
-        text_rect = text_surface.get_rect(center=(key_left + key_width // 2, key_top + key_height // 2))
-        screen.blit(text_surface, text_rect)
+        text_rect = text_surface.get_rect(center=key_rect.center)
+        keyboard_bg.blit(text_surface, text_rect)
+
+        key_rects.append(key_rect.move(KEYBOARD_AREA_LEFT, KEYBOARD_AREA_TOP))
+        key_labels.append((text_surface, text_rect.move(KEYBOARD_AREA_LEFT, KEYBOARD_AREA_TOP)))
+    return keyboard_bg, key_rects, key_labels
+
+KEYBOARD_BG, KEY_RECTS, KEY_LABELS = build_keyboard()
 
-def draw_visualization(joystick_x, joystick_y, joystick_z, button_states):
+def draw_keyboard(button_mask):
+    screen.blit(KEYBOARD_BG, (KEYBOARD_AREA_LEFT, KEYBOARD_AREA_TOP))
+    # Only pressed keys need drawing on top: fill inside the 2px border, then put the number back
+    for i, key_rect in enumerate(KEY_RECTS):
+        if button_mask & (1 << i):
+            screen.fill(LIGHT_BLUE, key_rect.inflate(-4, -4))
+            screen.blit(*KEY_LABELS[i])
+
+def draw_visualization(joystick_x, joystick_y, joystick_z, button_mask):
     screen.fill(BLACK)  # Clear screen
-    draw_joystick(joystick_x, joystick_y, joystick_z)
-    draw_keyboard(button_states)
+    # Lock once around the joystick's draw primitives instead of once per primitive;
+    # SDL refuses to blit onto a locked surface, so the keyboard goes on after unlocking
+    screen.lock()
+    try:
+        draw_joystick(joystick_x, joystick_y, joystick_z)
+    finally:
+        screen.unlock()
+    draw_keyboard(button_mask)
     pygame.display.flip()
 
 def main():
@@ -177,7 +213,7 @@ def main():
         read_thread = threading.Thread(target=device_read_thread, args=(device, data_queue, stop_event))
         read_thread.start()
 
-        button_states = [None] * 12  # Initialize button states
+        button_mask = 0  # Initialize button states, no buttons held
 
         # Main loop
         running = True
@@ -191,8 +227,8 @@ def main():
             while not data_queue.empty():
                 data = data_queue.get_nowait()
                 if data:
-                    joystick_x, joystick_y, joystick_z = parse_joystick(data, button_states)
-                    draw_visualization(joystick_x, joystick_y, joystick_z, button_states)
+                    joystick_x, joystick_y, joystick_z, button_mask = parse_joystick(data, button_mask)
+                    draw_visualization(joystick_x, joystick_y, joystick_z, button_mask)
 
             clock.tick(FPS)
 